@@ -1,6 +1,8 @@
 import argparse
+import hashlib
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Sequence, Tuple
 
 from PIL import Image, ImageDraw, ImageFont
@@ -39,7 +41,8 @@ def resolve_ids_from_csv(csv_path: str, id_col: str | None = None) -> List[str]:
     return [str(v) for v in df[id_col].tolist()]
 
 
-def draw_placeholder(img: Image.Image, text: str, text_color: str, bg_color: str) -> None:
+def draw_background(img: Image.Image, bg_color: str) -> None:
+    """Draw the shared house placeholder artwork (identical for every id)."""
     d = ImageDraw.Draw(img)
     w, h = img.size
     d.rectangle([(0, 0), (w, h)], fill=bg_color)
@@ -58,17 +61,82 @@ def draw_placeholder(img: Image.Image, text: str, text_color: str, bg_color: str
     door_x1 = door_x0 + door_w
     door_y0 = door_y1 - door_h
     d.rectangle([(door_x0, door_y0), (door_x1, door_y1)], outline="#ffffff", width=2)
-    text_str = f"ObjectId: {text}"
+
+
+def resolve_font(image_width: int) -> ImageFont.ImageFont:
+    """Load the label font once for a given image width (font parsing is slow)."""
     try:
-        font = ImageFont.truetype("arial.ttf", size=max(14, w // 20))
+        return ImageFont.truetype("arial.ttf", size=max(14, image_width // 20))
     except Exception:
-        font = ImageFont.load_default()
-    tw, th = d.textsize(text_str, font=font)
+        return ImageFont.load_default()
+
+
+def draw_text(
+    img: Image.Image, text: str, text_color: str, font: ImageFont.ImageFont | None = None
+) -> None:
+    """Draw the per-id ObjectId label (the only part that varies)."""
+    d = ImageDraw.Draw(img)
+    w, h = img.size
+    house_y0 = (h - int(h * 0.5)) // 2 + int(h * 0.05)
+    text_str = f"ObjectId: {text}"
+    if font is None:
+        font = resolve_font(w)
+    left, top, right, bottom = d.textbbox((0, 0), text_str, font=font)
+    tw, th = right - left, bottom - top
     tx = (w - tw) // 2
     ty = max(5, (house_y0 // 2) - th // 2)
     d.text((tx, ty), text_str, fill=text_color, font=font)
 
 
+def draw_placeholder(img: Image.Image, text: str, text_color: str, bg_color: str) -> None:
+    draw_background(img, bg_color)
+    draw_text(img, text, text_color)
+
+
+def _config_hash(sid: str, size: Tuple[int, int], bg_color: str, text_color: str) -> str:
+    """Cheap fingerprint of everything that affects an image's pixels."""
+    payload = f"{sid}|{size}|{bg_color}|{text_color}".encode()
+    return hashlib.blake2b(payload, digest_size=8).hexdigest()
+
+
+def _read_tag(tag_path: str) -> str | None:
+    try:
+        with open(tag_path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _write_tag(tag_path: str, cfg_hash: str) -> None:
+    try:
+        with open(tag_path, "w", encoding="utf-8") as f:
+            f.write(cfg_hash)
+    except OSError:
+        pass  # tags are an optimization only
+
+
+_WORKER_BASE: Image.Image | None = None
+_WORKER_TEXT_COLOR = "#ffffff"
+_WORKER_FONT: ImageFont.ImageFont | None = None
+
+
+def _init_render_worker(size: Tuple[int, int], bg_color: str, text_color: str) -> None:
+    """Build the shared base image and font once per pool worker."""
+    global _WORKER_BASE, _WORKER_TEXT_COLOR, _WORKER_FONT
+    _WORKER_BASE = Image.new("RGB", size)
+    draw_background(_WORKER_BASE, bg_color)
+    _WORKER_TEXT_COLOR = text_color
+    _WORKER_FONT = resolve_font(size[0])
+
+
+def _render_one(job: Tuple[str, str, str, str]) -> None:
+    sid, out_path, tag_path, cfg_hash = job
+    img = _WORKER_BASE.copy()
+    draw_text(img, sid, _WORKER_TEXT_COLOR, font=_WORKER_FONT)
+    img.save(out_path, format="JPEG", quality=90, optimize=False, progressive=False)
+    _write_tag(tag_path, cfg_hash)
+
+
 def generate_images(
     ids: Sequence[str],
     out_dir: str,
@@ -76,16 +144,43 @@ def generate_images(
     bg_color: str = "#2b6cb0",
     text_color: str = "#ffffff",
     overwrite: bool = False,
+    workers: int | None = None,
 ) -> None:
     os.makedirs(out_dir, exist_ok=True)
+    todo: List[Tuple[str, str, str, str]] = []
     for id_val in ids:
         sid = sanitize_id(id_val)
         out_path = os.path.join(out_dir, f"{sid}.jpg")
-        if os.path.exists(out_path) and not overwrite:
-            continue
-        img = Image.new("RGB", size)
-        draw_placeholder(img, sid, text_color=text_color, bg_color=bg_color)
-        img.save(out_path, format="JPEG", quality=90)
+        tag_path = os.path.join(out_dir, f"{sid}.tag")
+        cfg_hash = _config_hash(sid, size, bg_color, text_color)
+        if os.path.exists(out_path):
+            if not overwrite:
+                continue
+            if _read_tag(tag_path) == cfg_hash:
+                # Rendered pixels would be identical; skip the re-encode
+                continue
+        todo.append((sid, out_path, tag_path, cfg_hash))
+    if not todo:
+        return
+
+    if workers and workers > 1:
+        # Each id is independent; workers rebuild the base once, not per id
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(size, bg_color, text_color),
+        ) as executor:
+            list(executor.map(_render_one, todo))
+    else:
+        # Render the shared background and font once, redraw only text per id
+        base = Image.new("RGB", size)
+        draw_background(base, bg_color)
+        font = resolve_font(size[0])
+        for sid, out_path, tag_path, cfg_hash in todo:
+            img = base.copy()
+            draw_text(img, sid, text_color, font=font)
+            img.save(out_path, format="JPEG", quality=90, optimize=False, progressive=False)
+            _write_tag(tag_path, cfg_hash)
 
 
 def main():
@@ -104,6 +199,7 @@ def main():
     parser.add_argument("--bg", default="#2b6cb0", help="Background color hex")
     parser.add_argument("--text", default="#ffffff", help="Text color hex")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite existing files")
+    parser.add_argument("--workers", type=int, default=None, help="Render in parallel with this many processes")
 
     args = parser.parse_args()
 
@@ -123,6 +219,7 @@ def main():
         bg_color=args.bg,
         text_color=args.text,
         overwrite=args.overwrite,
+        workers=args.workers,
     )
 
 
@@ -1,11 +1,47 @@
+import asyncio
+import csv
+import hashlib
 import os
 import json
+import re
 import time
+import numpy as np
 import pandas as pd
 from sklearn.metrics import accuracy_score, f1_score, confusion_matrix, ConfusionMatrixDisplay
 import matplotlib.pyplot as plt
 
-from .vision import call_vision_model, call_text_model
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional
+    orjson = None  # Fall back to stdlib json
+
+from .vision import (
+    call_vision_model_async,
+    call_text_model_async,
+    DEFAULT_VISION_MODEL,
+    DEFAULT_TEXT_MODEL,
+)
+
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# Keys of the VLM JSON schema used by the occupancy rule
+_NA_KEYS = [
+    "building inaccessible",
+    "house destroyed",
+    "is there a red cross or zero written on the building",
+]
+_RISK_KEYS = [
+    "house damaged",
+    "debris outside house",
+    "doors or windows open",
+    "is there large area of mud outside",
+    "major repair work going on around the house (Wall pannels or Roof)",
+    "is there repair work going on around the house",
+]
+_CARS_KEY = (
+    "are there any cars parked right outside the concerned house "
+    "(not the black car rooftop partially visible)"
+)
 
 
 def decide_occupancy(api_output_str: str) -> str:
@@ -16,7 +52,7 @@ def decide_occupancy(api_output_str: str) -> str:
     Returns:
         str: 'Occupied' or 'Not Occupied'.
     """
-    data = json.loads(api_output_str)
+    data = _json_loads(api_output_str)
 
     if (
         data.get("building inaccessible", True)
@@ -51,6 +87,241 @@ def decide_occupancy(api_output_str: str) -> str:
             return "Occupied"
 
 
+def decide_occupancy_batch(json_strings: pd.Series) -> pd.Series:
+    """
+    Vectorized `decide_occupancy` over a whole Series of VLM JSON strings.
+
+    Parses every payload once, then stores the ~10 rule keys as a struct of
+    arrays (one packed numpy bool array per key, 1 byte/row instead of a
+    Python dict per row) and evaluates the occupancy rule with numpy boolean
+    operations instead of branching per row. Rows whose payload fails to
+    parse yield '' (matching the per-image error path).
+    Args:
+        json_strings (Series): JSON outputs from VLM, one per row.
+    Returns:
+        Series: 'Occupied' / 'Not Occupied' per row ('' for invalid JSON).
+    """
+    n = len(json_strings)
+    dicts: list[dict] = []
+    valid = np.ones(n, dtype=bool)
+    for i, s in enumerate(json_strings):
+        try:
+            dicts.append(_json_loads(s))
+        except Exception:
+            dicts.append({})
+            valid[i] = False
+
+    defaults = dict.fromkeys(_NA_KEYS, True) | dict.fromkeys(_RISK_KEYS, False)
+    defaults[_CARS_KEY] = True
+    soa = {
+        key: np.fromiter((bool(d.get(key, default)) for d in dicts), dtype=np.bool_, count=n)
+        for key, default in defaults.items()
+    }
+    dicts.clear()  # column arrays are all we need from here on
+
+    na_mask = np.zeros(n, dtype=bool)
+    for key in _NA_KEYS:
+        na_mask |= soa[key]
+
+    risk_sum = np.zeros(n, dtype=np.int8)
+    for key in _RISK_KEYS:
+        risk_sum += soa[key].astype(np.int8)
+
+    cars = soa[_CARS_KEY]
+    not_occupied = na_mask | (cars & (risk_sum >= 3)) | (~cars & (risk_sum >= 2))
+    out = np.where(not_occupied, "Not Occupied", "Occupied")
+    return pd.Series(np.where(valid, out, ""), index=json_strings.index)
+
+
+# Matches a fenced JSON block (with optional language tag) or a bare object
+_JSON_RE = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```|(\{.*\})", re.DOTALL)
+
+
+def _extract_json_text(v_out: str) -> str:
+    """Strip surrounding code fences or prose so the payload parses as JSON."""
+    m = _JSON_RE.search(v_out)
+    if m:
+        return next(g for g in m.groups() if g)
+    return v_out.strip()
+
+
+def _cache_lookup(cache_dir: str, key: str) -> str | None:
+    """Return the cached model output for `key`, or None on a miss."""
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)["output"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _cache_store(cache_dir: str, key: str, output: str) -> None:
+    path = os.path.join(cache_dir, f"{key}.json")
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"output": output}, f)
+    except OSError:
+        pass  # cache writes are best-effort
+
+
+def _vision_cache_key(image_path: str) -> str:
+    """SHA-256 over image bytes + vision model id, so edits or model bumps miss."""
+    with open(image_path, "rb") as f:
+        return hashlib.sha256(f.read() + DEFAULT_VISION_MODEL.encode()).hexdigest()
+
+
+def _text_cache_key(vision_output: str) -> str:
+    return hashlib.sha256((vision_output + DEFAULT_TEXT_MODEL).encode()).hexdigest()
+
+
+class _TokenBucket:
+    """Minimal async token-bucket limiter: at most `max_rate` acquires per second.
+
+    Unlike a fixed per-request sleep, this only waits when the rolling rate cap
+    is actually hit, so runs under quota pay no idle time.
+    """
+
+    def __init__(self, max_rate: float) -> None:
+        self._max_rate = max_rate
+        self._tokens = max_rate
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._max_rate, self._tokens + (now - self._updated) * self._max_rate
+                )
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._max_rate)
+
+
+async def _process_queries(
+    queries: list[tuple[int, str]],
+    use_llm: bool,
+    batch_size: int = 8,
+    concurrency: int = 8,
+    rate_limit: float | None = None,
+    cache_dir: str | None = None,
+    on_result=None,
+) -> tuple[list[str], list[str], int, int]:
+    """Run vision and text model calls as a two-stage async pipeline.
+
+    Stage A issues vision calls in micro-batches of `batch_size`; stage B
+    consumes completed vision outputs from an `asyncio.Queue` and issues the
+    text-LLM decision (in rule-based mode stage B is skipped and each micro-
+    batch is evaluated with `decide_occupancy_batch` as it lands). Both stages
+    run concurrently, each bounded by its own semaphore of `concurrency`
+    in-flight calls, so text time overlaps vision time instead of adding to
+    it. Outputs are keyed by query index so results are reassembled in input
+    order regardless of completion order.
+
+    `on_result(idx, vision_output, occupancy)` is invoked once per query as
+    soon as its decision is final, letting the caller stream rows to disk
+    instead of buffering the whole run.
+    """
+    vision_sem = asyncio.Semaphore(concurrency)
+    text_sem = asyncio.Semaphore(concurrency)
+    limiter = _TokenBucket(rate_limit) if rate_limit else None
+    vision_queue: asyncio.Queue = asyncio.Queue()
+    vision_by_idx: dict[int, str] = {}
+    results_by_idx: dict[int, str] = {}
+    vision_token = 0
+    llm_token = 0
+
+    async def _vision_one(idx: int, image_path: str) -> None:
+        nonlocal vision_token
+        try:
+            cache_key = None
+            v_out = None
+            if cache_dir:
+                cache_key = _vision_cache_key(image_path)
+                v_out = _cache_lookup(cache_dir, cache_key)
+            if v_out is None:
+                async with vision_sem:
+                    if limiter:
+                        await limiter.acquire()
+                    v_out, vt = await call_vision_model_async(image_path)
+                vision_token += vt or 0
+                if cache_dir and cache_key:
+                    _cache_store(cache_dir, cache_key, v_out)
+        except Exception as e:
+            print(f"Error processing {os.path.basename(image_path)}: {e}")
+            vision_by_idx[idx] = ""
+            if use_llm:
+                # Rule-based rows are finalized per micro-batch below.
+                results_by_idx[idx] = ""
+                if on_result:
+                    on_result(idx, "", "")
+            return
+        vision_by_idx[idx] = v_out
+        if use_llm:
+            await vision_queue.put((idx, v_out))
+
+    async def _text_one(idx: int, v_out: str) -> None:
+        nonlocal llm_token
+        try:
+            cache_key = _text_cache_key(v_out) if cache_dir else None
+            occ = _cache_lookup(cache_dir, cache_key) if cache_key else None
+            if occ is None:
+                async with text_sem:
+                    if limiter:
+                        await limiter.acquire()
+                    occ, lt = await call_text_model_async(v_out)
+                llm_token += lt or 0
+                if cache_dir and cache_key:
+                    _cache_store(cache_dir, cache_key, occ)
+        except Exception as e:
+            print(f"Error deciding occupancy for query {idx}: {e}")
+            occ = ""
+        results_by_idx[idx] = occ
+        if on_result:
+            on_result(idx, v_out, occ)
+
+    async def _vision_stage() -> None:
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start : start + batch_size]
+            await asyncio.gather(*(_vision_one(idx, path) for idx, path in batch))
+            if not use_llm and batch:
+                # Rule-based mode: decide each micro-batch as it completes so
+                # results can stream out without holding the full run in RAM.
+                pairs = [(idx, vision_by_idx.get(idx, "")) for idx, _ in batch]
+                occs = decide_occupancy_batch(
+                    pd.Series([_extract_json_text(v) for _, v in pairs])
+                ).tolist()
+                for (idx, v_out), occ in zip(pairs, occs):
+                    results_by_idx[idx] = occ
+                    if on_result:
+                        on_result(idx, v_out, occ)
+        await vision_queue.put(None)  # sentinel: no more vision outputs
+
+    async def _text_stage() -> None:
+        pending: list[asyncio.Task] = []
+        while True:
+            item = await vision_queue.get()
+            if item is None:
+                break
+            idx, v_out = item
+            pending.append(asyncio.create_task(_text_one(idx, v_out)))
+        if pending:
+            await asyncio.gather(*pending)
+
+    await asyncio.gather(_vision_stage(), _text_stage())
+
+    order = [idx for idx, _ in queries]
+    return (
+        [vision_by_idx.get(i, "") for i in order],
+        [results_by_idx.get(i, "") for i in order],
+        vision_token,
+        llm_token,
+    )
+
+
 def plot_confusion_matrix(y_true, y_pred, title, labels):
     """
     Ploting confusion matrix for classification results.
@@ -77,6 +348,10 @@ def run_vlm_pipeline(
     use_llm: bool = True,
     ground_truth_csv: str | None = None,
     image_id_column: str | None = None,
+    batch_size: int = 8,
+    concurrency: int = 8,
+    rate_limit: float | None = None,
+    cache_dir: str | None = None,
 ) -> None:
     """
     Run the VLM pipeline over images listed in CSV, producing predictions.
@@ -88,6 +363,16 @@ def run_vlm_pipeline(
         use_llm: If True, use text LLM for final decision; else rule-based.
         ground_truth_csv: Optional path to a CSV with labels for evaluation.
         image_id_column: Optional explicit column name for image id.
+        batch_size: Number of images submitted per micro-batch.
+        concurrency: Max in-flight API calls at any time.
+        rate_limit: Optional cap on API requests per second (token bucket).
+        cache_dir: Optional directory for caching model outputs by content
+            hash; reruns over the same images skip the network calls.
+
+    Rows are appended to `output_csv_path` as each decision completes, so
+    memory stays bounded and an interrupted run can resume: on startup any
+    ids already present in the output CSV are skipped (mirroring
+    `run_smart_dewarping`'s skip-existing behavior).
     """
     df = pd.read_csv(csv_path)
 
@@ -103,58 +388,86 @@ def run_vlm_pipeline(
 
     ids = df[id_col].astype(str)
     image_filenames = ids + ".jpg"
+    out_fields = [*df.columns, "Vision Model Output", "Occupancy Prediction"]
+    os.makedirs(os.path.dirname(output_csv_path) or ".", exist_ok=True)
 
-    results = []
-    vision_outputs = []
-    vision_token = 0
-    llm_token = 0
-
-    for filename in image_filenames:
-        image_path = os.path.join(base_image_dir, filename)
+    # Resume support: skip ids already written by a previous (interrupted) run.
+    done_ids: set[str] = set()
+    if os.path.exists(output_csv_path):
         try:
-            v_out, vt = call_vision_model(image_path)
-            vision_outputs.append(v_out)
-            vision_token += vt or 0
-            time.sleep(1)  # rate limiting
-            if use_llm:
-                occ, lt = call_text_model(v_out)
-                results.append(occ)
-                llm_token += lt or 0
-            else:
-                # Expect strict JSON; if model wraps it, attempt to extract
-                txt = v_out.strip()
-                # naive strip of surrounding code fences or text
-                if txt.startswith("```"):
-                    txt = txt.strip("`\n").split("\n", 1)[-1]
-                if not txt.startswith("{"):
-                    # fallback: find first '{' to end '}'
-                    s = txt.find("{")
-                    e = txt.rfind("}")
-                    if s != -1 and e != -1:
-                        txt = txt[s : e + 1]
-                occ = decide_occupancy(txt)
-                results.append(occ)
-        except Exception as e:
-            print(f"Error processing {filename}: {e}")
-            vision_outputs.append("")
-            results.append("")
+            prev = pd.read_csv(output_csv_path)
+            if list(prev.columns) == out_fields:
+                done_ids = set(prev[id_col].astype(str))
+        except Exception:
+            done_ids = set()
+    if done_ids:
+        print(f"Resuming: {len(done_ids)} rows already in {output_csv_path}")
+
+    queries = [
+        (idx, os.path.join(base_image_dir, filename))
+        for idx, (sid, filename) in enumerate(zip(ids, image_filenames))
+        if sid not in done_ids
+    ]
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+
+    out_f = open(output_csv_path, "a" if done_ids else "w", newline="")
+    writer = csv.DictWriter(out_f, fieldnames=out_fields)
+    if not done_ids:
+        writer.writeheader()
+
+    # Completions arrive out of order; buffer them and emit rows in input
+    # order so the CSV stays positionally aligned with the input (the
+    # no-id-column evaluation fallback relies on that). The buffer is bounded
+    # by the number of in-flight calls.
+    write_order = [idx for idx, _ in queries]
+    buffered: dict[int, tuple[str, str]] = {}
+    next_pos = 0
+
+    def _write_row(idx: int, v_out: str, occ: str) -> None:
+        # Called from the event loop as each decision lands; flush so a crash
+        # loses at most the buffered in-flight rows.
+        nonlocal next_pos
+        buffered[idx] = (v_out, occ)
+        while next_pos < len(write_order) and write_order[next_pos] in buffered:
+            ready_idx = write_order[next_pos]
+            ready_v_out, ready_occ = buffered.pop(ready_idx)
+            row = df.iloc[ready_idx].to_dict()
+            row["Vision Model Output"] = ready_v_out
+            row["Occupancy Prediction"] = ready_occ
+            writer.writerow(row)
+            next_pos += 1
+        out_f.flush()
+
+    try:
+        _, _, vision_token, llm_token = asyncio.run(
+            _process_queries(
+                queries,
+                use_llm=use_llm,
+                batch_size=batch_size,
+                concurrency=concurrency,
+                rate_limit=rate_limit,
+                cache_dir=cache_dir,
+                on_result=_write_row,
+            )
+        )
+    finally:
+        out_f.close()
 
     print("Total Vision Tokens:", vision_token)
     print("Total LLM Tokens:", llm_token)
-
-    df_out = df.copy()
-    df_out["Vision Model Output"] = vision_outputs
-    df_out["Occupancy Prediction"] = results
-    os.makedirs(os.path.dirname(output_csv_path) or ".", exist_ok=True)
-    df_out.to_csv(output_csv_path, index=False)
     print(f"Results saved to {output_csv_path}")
 
     # Optional evaluation
     if ground_truth_csv and os.path.exists(ground_truth_csv):
+        df_out = pd.read_csv(output_csv_path)
         df_eval = pd.read_csv(ground_truth_csv)
         if "label" not in df_eval.columns or "Occupancy Prediction" not in df_out.columns:
             print("Ground truth CSV must contain 'label' column for evaluation.")
             return
+        # Failed rows carry an empty-string prediction; read_csv turns those
+        # into NaN, which the sklearn scorers choke on. Restore the strings.
+        df_out["Occupancy Prediction"] = df_out["Occupancy Prediction"].fillna("")
         # Align by id_col if present in both
         if id_col in df_eval.columns:
             merged = df_eval[[id_col, "label"]].merge(
@@ -169,6 +482,13 @@ def run_vlm_pipeline(
 
         y_true = y_true.dropna()
         y_pred = y_pred.iloc[y_true.index]
+        # Rows with no prediction (failed model calls) can't be scored and
+        # would introduce a third class into the binary F1; skip them.
+        scored = y_pred.to_numpy() != ""
+        if not scored.all():
+            print(f"Skipping {int((~scored).sum())} rows with no prediction")
+        y_true = y_true[scored]
+        y_pred = y_pred[scored]
         acc = accuracy_score(y_true, y_pred)
         f1 = f1_score(y_true, y_pred, pos_label="Not Occupied")
         f1w = f1_score(y_true, y_pred, average="weighted")
@@ -197,6 +517,10 @@ if __name__ == "__main__":
     parser.add_argument("--no-llm", action="store_true", help="Use rule-based classifier instead of LLM")
     parser.add_argument("--gt_csv", default=None, help="Optional ground truth CSV for evaluation")
     parser.add_argument("--image_id_column", default=None, help="Explicit image id column name if not standard")
+    parser.add_argument("--batch_size", type=int, default=8, help="Images submitted per micro-batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Max in-flight API calls")
+    parser.add_argument("--rate_limit", type=float, default=None, help="Max API requests per second (default: unlimited)")
+    parser.add_argument("--cache-dir", default=None, help="Directory for caching model outputs across runs")
 
     args = parser.parse_args()
     run_vlm_pipeline(
@@ -206,4 +530,8 @@ if __name__ == "__main__":
         use_llm=not args.no_llm,
         ground_truth_csv=args.gt_csv,
         image_id_column=args.image_id_column,
+        batch_size=args.batch_size,
+        concurrency=args.concurrency,
+        rate_limit=args.rate_limit,
+        cache_dir=args.cache_dir,
     )
@@ -40,6 +40,7 @@ def main():
     p_dewarp.add_argument("--width", type=int, default=1920)
     p_dewarp.add_argument("--aspect", type=str, default="16:9")
     p_dewarp.add_argument("--yaw_offset", type=float, default=-90.0)
+    p_dewarp.add_argument("--workers", type=int, default=None, help="Parallel dewarp workers (default: half the CPUs)")
 
     p_sdewarp = sub.add_parser("dewarp-smart", help="Dewarp, skipping existing outputs")
     p_sdewarp.add_argument("csv", help="CSV with ObjectId, coords, vehicle coords, orientation")
@@ -50,6 +51,7 @@ def main():
     p_sdewarp.add_argument("--width", type=int, default=1920)
     p_sdewarp.add_argument("--aspect", type=str, default="16:9")
     p_sdewarp.add_argument("--yaw_offset", type=float, default=-90.0)
+    p_sdewarp.add_argument("--workers", type=int, default=None, help="Parallel dewarp workers (default: half the CPUs)")
 
     p_vlm = sub.add_parser("vlm", help="Run VLM occupancy pipeline over images")
     p_vlm.add_argument("csv", help="CSV with 'ObjectId' or 'objectid' column")
@@ -58,6 +60,10 @@ def main():
     p_vlm.add_argument("--no-llm", action="store_true", help="Use rule-based classifier instead of LLM")
     p_vlm.add_argument("--gt_csv", default=None, help="Optional ground truth CSV for evaluation")
     p_vlm.add_argument("--image_id_column", default=None, help="Explicit image id column name if not standard")
+    p_vlm.add_argument("--batch_size", type=int, default=8, help="Images submitted per micro-batch")
+    p_vlm.add_argument("--concurrency", type=int, default=8, help="Max in-flight API calls")
+    p_vlm.add_argument("--rate_limit", type=float, default=None, help="Max API requests per second (default: unlimited)")
+    p_vlm.add_argument("--cache-dir", default=None, help="Directory for caching model outputs across runs")
 
     args = parser.parse_args()
 
@@ -85,6 +91,7 @@ def main():
             output_width=args.width,
             aspect_ratio=args.aspect,
             yaw_offset=args.yaw_offset,
+            max_workers=args.workers,
         )
     elif args.cmd == "dewarp-smart":
         run_smart_dewarping(
@@ -96,6 +103,7 @@ def main():
             output_width=args.width,
             aspect_ratio=args.aspect,
             yaw_offset=args.yaw_offset,
+            max_workers=args.workers,
         )
     elif args.cmd == "vlm":
         run_vlm_pipeline(
@@ -105,6 +113,10 @@ def main():
             use_llm=not args.no_llm,
             ground_truth_csv=args.gt_csv,
             image_id_column=args.image_id_column,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+            rate_limit=args.rate_limit,
+            cache_dir=args.cache_dir,
         )
 
 
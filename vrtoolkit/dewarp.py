@@ -1,12 +1,68 @@
 import os
-import glob
 import math
+import re
 import subprocess
-from typing import Optional, Union
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from .orientation import calculate_bearing
+try:
+    import cv2  # type: ignore
+except Exception:  # pragma: no cover - optional
+    cv2 = None  # Fall back to the FFmpeg dewarp path
+
+try:
+    from numba import njit  # type: ignore
+except Exception:  # pragma: no cover - optional
+    njit = None  # Plain numpy is still vectorized, just not JIT-compiled
+
+
+def _compute_yaws_impl(
+    building_lon: np.ndarray,
+    building_lat: np.ndarray,
+    camera_lon: np.ndarray,
+    camera_lat: np.ndarray,
+    vehicle_orientation: np.ndarray,
+    yaw_offset: float,
+) -> np.ndarray:
+    """Camera-to-building yaw for every row at once.
+
+    Inlines the haversine bearing formula over whole arrays, then applies the
+    modulo/offset normalization branchlessly. NaN inputs propagate to NaN
+    outputs so callers can skip incomplete rows with one isfinite check.
+    """
+    lat1 = np.radians(camera_lat)
+    lon1 = np.radians(camera_lon)
+    lat2 = np.radians(building_lat)
+    lon2 = np.radians(building_lon)
+    d_lon = lon2 - lon1
+    y = np.sin(d_lon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon)
+    bearing = (np.degrees(np.arctan2(y, x)) + 360.0) % 360.0
+    yaw = (bearing - vehicle_orientation) % 360.0 + yaw_offset
+    yaw = np.where(yaw > 180.0, yaw - 360.0, yaw)
+    yaw = np.where(yaw <= -180.0, yaw + 360.0, yaw)
+    return yaw
+
+
+if njit is not None:
+    compute_yaws = njit(fastmath=True, cache=True)(_compute_yaws_impl)
+else:
+    compute_yaws = _compute_yaws_impl
+
+
+def _numeric_columns(df: pd.DataFrame, columns: list[str]) -> list[np.ndarray]:
+    """Resolve named CSV columns to float64 arrays once, before any row loop."""
+    return [pd.to_numeric(df[c], errors="coerce").to_numpy(np.float64) for c in columns]
+
+
+def _default_workers() -> int:
+    # Half the cores: each ffmpeg child uses threads of its own.
+    return max(1, (os.cpu_count() or 2) // 2)
 
 
 def calculate_vertical_fov(horizontal_fov_deg: float, aspect_ratio_w_h: float) -> float:
@@ -15,6 +71,182 @@ def calculate_vertical_fov(horizontal_fov_deg: float, aspect_ratio_w_h: float) -
     return math.degrees(v_fov_rad)
 
 
+def build_remap_maps(
+    yaw: float,
+    pitch: float,
+    roll: float,
+    h_fov: float,
+    v_fov: float,
+    out_w: int,
+    out_h: int,
+    in_w: int,
+    in_h: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute cv2.remap maps for an equirectangular-to-rectilinear view.
+
+    For each output pixel, casts a ray through a rectilinear camera with the
+    given FOV, rotates it by yaw/pitch/roll, and converts the direction back
+    to equirectangular (u, v) source coordinates. The maps are fixed for a
+    given parameter set, so they are computed once and reused across frames.
+    """
+    half_w = math.tan(math.radians(h_fov) / 2)
+    half_h = math.tan(math.radians(v_fov) / 2)
+    x = np.linspace(-half_w, half_w, out_w, dtype=np.float64)
+    y = np.linspace(-half_h, half_h, out_h, dtype=np.float64)
+    xv, yv = np.meshgrid(x, y)
+
+    # Camera frame: x right, y down, z forward
+    dirs = np.stack([xv, yv, np.ones_like(xv)], axis=-1)
+    dirs /= np.linalg.norm(dirs, axis=-1, keepdims=True)
+
+    yaw_r = math.radians(yaw)
+    pitch_r = math.radians(pitch)
+    roll_r = math.radians(roll)
+    rot_yaw = np.array(
+        [
+            [math.cos(yaw_r), 0.0, math.sin(yaw_r)],
+            [0.0, 1.0, 0.0],
+            [-math.sin(yaw_r), 0.0, math.cos(yaw_r)],
+        ]
+    )
+    # Positive pitch tilts the view up (y axis points down)
+    rot_pitch = np.array(
+        [
+            [1.0, 0.0, 0.0],
+            [0.0, math.cos(pitch_r), -math.sin(pitch_r)],
+            [0.0, math.sin(pitch_r), math.cos(pitch_r)],
+        ]
+    )
+    rot_roll = np.array(
+        [
+            [math.cos(roll_r), -math.sin(roll_r), 0.0],
+            [math.sin(roll_r), math.cos(roll_r), 0.0],
+            [0.0, 0.0, 1.0],
+        ]
+    )
+    rotation = rot_yaw @ rot_pitch @ rot_roll
+    d = dirs @ rotation.T
+
+    lon = np.arctan2(d[..., 0], d[..., 2])
+    lat = np.arcsin(np.clip(-d[..., 1], -1.0, 1.0))
+    mapx = (lon / (2 * math.pi) + 0.5) * in_w - 0.5
+    mapy = (0.5 - lat / math.pi) * in_h - 0.5
+    return mapx.astype(np.float32), mapy.astype(np.float32)
+
+
+@lru_cache(maxsize=32)
+def _cached_remap_maps(
+    yaw_q: float,
+    pitch_q: float,
+    roll_q: float,
+    h_fov: float,
+    v_fov: float,
+    out_w: int,
+    out_h: int,
+    in_w: int,
+    in_h: int,
+) -> Tuple[np.ndarray, np.ndarray]:
+    return build_remap_maps(yaw_q, pitch_q, roll_q, h_fov, v_fov, out_w, out_h, in_w, in_h)
+
+
+def _dewarp_frame_cv2(
+    input_path: str,
+    output_path: str,
+    yaw: float,
+    pitch: float,
+    roll: float,
+    horizontal_fov: float,
+    output_width: int,
+    aspect_ratio_str: str,
+) -> bool:
+    """Dewarp one frame in-process via cv2.remap with cached projection maps."""
+    img = cv2.imread(input_path)
+    if img is None:
+        return False
+    in_h, in_w = img.shape[:2]
+
+    try:
+        w_ratio, h_ratio = map(int, aspect_ratio_str.split(":"))
+        aspect_ratio = w_ratio / h_ratio
+    except Exception:
+        aspect_ratio = 16 / 9
+    output_height = int(output_width / aspect_ratio)
+    vertical_fov = calculate_vertical_fov(horizontal_fov, aspect_ratio)
+
+    mapx, mapy = _cached_remap_maps(
+        round(yaw, 2),
+        round(pitch, 2),
+        round(roll, 2),
+        horizontal_fov,
+        vertical_fov,
+        output_width,
+        output_height,
+        in_w,
+        in_h,
+    )
+    out = cv2.remap(img, mapx, mapy, cv2.INTER_LINEAR, borderMode=cv2.BORDER_WRAP)
+    return bool(cv2.imwrite(output_path, out, [int(cv2.IMWRITE_JPEG_QUALITY), 95]))
+
+
+def jpeg_dims(path: str) -> Optional[Tuple[int, int]]:
+    """Read (width, height) from a JPEG's SOF marker without decoding pixels.
+
+    Scans only header bytes (tens of bytes for typical files), far cheaper
+    than a full PIL header parse. Returns None if the file is not a
+    parseable JPEG.
+    """
+    try:
+        with open(path, "rb") as f:
+            if f.read(2) != b"\xff\xd8":
+                return None
+            while True:
+                b = f.read(2)
+                if len(b) < 2 or b[0] != 0xFF:
+                    return None
+                marker = b[1]
+                while marker == 0xFF:  # fill bytes before a marker
+                    nxt = f.read(1)
+                    if not nxt:
+                        return None
+                    marker = nxt[0]
+                # SOF0..SOF15 except DHT/JPG/DAC carry the frame dimensions
+                if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                    seg = f.read(7)
+                    if len(seg) < 7:
+                        return None
+                    height = int.from_bytes(seg[3:5], "big")
+                    width = int.from_bytes(seg[5:7], "big")
+                    return width, height
+                if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                    continue  # standalone markers with no length field
+                length_bytes = f.read(2)
+                if len(length_bytes) < 2:
+                    return None
+                f.seek(int.from_bytes(length_bytes, "big") - 2, 1)
+    except OSError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _image_dims(path: str) -> Optional[Tuple[int, int]]:
+    """Image (width, height) via the JPEG header scan, PIL as fallback.
+
+    Memoized: the same source frame appears in several dewarp jobs (one per
+    yaw), and on networked storage each extra open() costs a metadata
+    round-trip.
+    """
+    dims = jpeg_dims(path)
+    if dims is not None:
+        return dims
+    try:
+        from PIL import Image
+
+        with Image.open(path) as img:
+            return img.size
+    except Exception:
+        return None
+
+
 def create_output_directory(output_dir: str) -> None:
     if not os.path.exists(output_dir):
         os.makedirs(output_dir)
@@ -32,19 +264,19 @@ def dewarp_single_frame(
 ) -> bool:
     """Dewarp a single equirectangular image frame using FFmpeg v360 filter."""
     # If the image is not panoramic, just copy it
-    try:
-        from PIL import Image
+    dims = _image_dims(input_path)
+    if dims is not None:
+        w, h = dims
+        if h == 0 or w / h < 2.0:
+            import shutil
 
-        with Image.open(input_path) as img:
-            w, h = img.size
-            if h == 0 or w / h < 2.0:
-                import shutil
+            shutil.copy2(input_path, output_path)
+            return True
 
-                shutil.copy2(input_path, output_path)
-                return True
-    except Exception:
-        # Continue anyway; try running FFmpeg
-        pass
+    if cv2 is not None and _dewarp_frame_cv2(
+        input_path, output_path, yaw, pitch, roll, horizontal_fov, output_width, aspect_ratio_str
+    ):
+        return True
 
     try:
         w_ratio, h_ratio = map(int, aspect_ratio_str.split(":"))
@@ -58,6 +290,8 @@ def dewarp_single_frame(
     cmd = [
         "ffmpeg",
         "-y",
+        "-threads",
+        "1",  # workers run many ffmpeg children; keep each single-threaded
         "-i",
         input_path,
         "-vf",
@@ -76,6 +310,209 @@ def dewarp_single_frame(
         return False
 
 
+def _dewarp_job(job: tuple) -> bool:
+    """Run one dewarp job tuple in a pool worker.
+
+    Job layout: (input_path, output_path, yaw, pitch, h_fov, output_width, aspect_ratio_str).
+    """
+    input_path, output_path, yaw, pitch, h_fov, output_width, aspect_ratio_str = job
+    return dewarp_single_frame(
+        input_path=input_path,
+        output_path=output_path,
+        yaw=yaw,
+        pitch=pitch,
+        roll=0.0,
+        horizontal_fov=h_fov,
+        output_width=output_width,
+        aspect_ratio_str=aspect_ratio_str,
+    )
+
+
+# Cap on inputs fed to a single ffmpeg process in batch mode
+_BATCH_INPUT_LIMIT = 32
+
+
+def _dewarp_group_job(group: tuple) -> bool:
+    """Dewarp several frames sharing one parameter set in a single ffmpeg run.
+
+    Group layout: ((yaw, pitch, h_fov, output_width, aspect_ratio_str),
+    [(input_path, output_path), ...]). Non-panoramic inputs are copied
+    through, mirroring `dewarp_single_frame`.
+    """
+    params, pairs = group
+    yaw, pitch, h_fov, output_width, aspect_ratio_str = params
+
+    remaining: list[tuple[str, str]] = []
+    for input_path, output_path in pairs:
+        dims = _image_dims(input_path)
+        if dims is not None:
+            w, h = dims
+            if h == 0 or w / h < 2.0:
+                import shutil
+
+                shutil.copy2(input_path, output_path)
+                continue
+        remaining.append((input_path, output_path))
+
+    if not remaining:
+        return True
+    if cv2 is not None:
+        # In-process remap: maps are cached per parameter set, so the whole
+        # group shares one projection computation and skips ffmpeg entirely.
+        if all(
+            _dewarp_frame_cv2(
+                input_path, output_path, yaw, pitch, 0.0, h_fov, output_width, aspect_ratio_str
+            )
+            for input_path, output_path in remaining
+        ):
+            return True
+    if len(remaining) == 1:
+        input_path, output_path = remaining[0]
+        return dewarp_single_frame(
+            input_path=input_path,
+            output_path=output_path,
+            yaw=yaw,
+            pitch=pitch,
+            roll=0.0,
+            horizontal_fov=h_fov,
+            output_width=output_width,
+            aspect_ratio_str=aspect_ratio_str,
+        )
+
+    try:
+        w_ratio, h_ratio = map(int, aspect_ratio_str.split(":"))
+        aspect = w_ratio / h_ratio
+    except Exception:
+        aspect = 16 / 9
+    output_height = int(output_width / aspect)
+    vertical_fov = calculate_vertical_fov(h_fov, aspect)
+    v360 = (
+        f"v360=e:rectilinear:h_fov={h_fov}:v_fov={vertical_fov}:"
+        f"yaw={yaw}:pitch={pitch}:roll=0.0:w={output_width}:h={output_height}"
+    )
+
+    cmd = ["ffmpeg", "-y", "-threads", "1"]
+    for input_path, _ in remaining:
+        cmd.extend(["-i", input_path])
+    cmd.extend(
+        [
+            "-filter_complex",
+            ";".join(f"[{i}:v]{v360}[o{i}]" for i in range(len(remaining))),
+        ]
+    )
+    for i, (_, output_path) in enumerate(remaining):
+        cmd.extend(["-map", f"[o{i}]", "-q:v", "2", output_path])
+    try:
+        res = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        if res.returncode == 0:
+            return True
+    except Exception:
+        pass
+    # Fall back to per-frame invocations if the batched command fails
+    ok = True
+    for input_path, output_path in remaining:
+        ok = (
+            dewarp_single_frame(
+                input_path=input_path,
+                output_path=output_path,
+                yaw=yaw,
+                pitch=pitch,
+                roll=0.0,
+                horizontal_fov=h_fov,
+                output_width=output_width,
+                aspect_ratio_str=aspect_ratio_str,
+            )
+            and ok
+        )
+    return ok
+
+
+# Frame stems are '<ObjectId>' or '<ObjectId>_<suffix>'
+_FRAME_STEM_RE = re.compile(r"^(.+?)(?:_(.+))?\.jpg$", re.IGNORECASE)
+
+
+def _index_frames(frames_input_dir: str) -> tuple[dict[str, list[str]], dict[str, list[str]]]:
+    """Index frame files by ObjectId with a single walk of the input tree.
+
+    Returns (exact, suffixed): `exact` maps a full stem to its paths
+    ('123.jpg'), `suffixed` maps the stem before the first underscore to
+    paths like '123_1.jpg'. One scandir walk replaces the four glob
+    patterns the row loop used to issue per row.
+    """
+    exact: dict[str, list[str]] = defaultdict(list)
+    suffixed: dict[str, list[str]] = defaultdict(list)
+
+    def _scan(directory: str) -> None:
+        try:
+            entries = os.scandir(directory)
+        except OSError:
+            return
+        with entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    _scan(entry.path)
+                    continue
+                m = _FRAME_STEM_RE.match(entry.name)
+                if not m:
+                    continue
+                if m.group(2) is None:
+                    exact[m.group(1)].append(entry.path)
+                else:
+                    suffixed[m.group(1)].append(entry.path)
+
+    _scan(frames_input_dir)
+    return exact, suffixed
+
+
+def dewarp_batch(jobs: list[tuple], max_workers: Optional[int] = None) -> None:
+    """Dewarp a list of job tuples, amortizing ffmpeg startup across frames.
+
+    Jobs sharing the same (yaw, pitch, fov, size) parameters are grouped into
+    one ffmpeg process (up to `_BATCH_INPUT_LIMIT` inputs each) and the groups
+    run on a process pool. Yaw is quantized to 0.01 degrees for grouping,
+    which is well below what the v360 remap can resolve visually.
+    """
+    # Rows can resolve to the same (input, parameters) tuple, e.g. several
+    # buildings sharing a frame. Dewarp each distinct tuple once and hardlink
+    # the remaining outputs afterwards.
+    done_cache: dict[tuple, str] = {}
+    links: list[tuple[str, str]] = []
+    unique_jobs: list[tuple] = []
+    for job in jobs:
+        input_path, output_path, yaw, pitch, h_fov, output_width, aspect_ratio_str = job
+        key = (input_path, round(yaw, 3), round(pitch, 3), h_fov, output_width, aspect_ratio_str)
+        first_output = done_cache.get(key)
+        if first_output is not None:
+            if first_output != output_path:
+                links.append((first_output, output_path))
+            continue
+        done_cache[key] = output_path
+        unique_jobs.append(job)
+
+    groups: dict[tuple, list[tuple[str, str]]] = defaultdict(list)
+    for input_path, output_path, yaw, pitch, h_fov, output_width, aspect_ratio_str in unique_jobs:
+        key = (round(yaw, 2), pitch, h_fov, output_width, aspect_ratio_str)
+        groups[key].append((input_path, output_path))
+
+    work: list[tuple] = []
+    for key, pairs in groups.items():
+        for i in range(0, len(pairs), _BATCH_INPUT_LIMIT):
+            work.append((key, pairs[i : i + _BATCH_INPUT_LIMIT]))
+
+    if work:
+        with ProcessPoolExecutor(max_workers=max_workers or _default_workers()) as executor:
+            list(executor.map(_dewarp_group_job, work))
+
+    for src, dst in links:
+        if os.path.exists(src) and not os.path.exists(dst):
+            try:
+                os.link(src, dst)  # same content, zero extra bytes
+            except OSError:
+                import shutil
+
+                shutil.copy2(src, dst)
+
+
 def run_frame_based_dewarping(
     csv_path: str = "./matched_filtered_buildings_orientation.csv",
     frames_input_dir: str = "./frames_output",
@@ -85,11 +522,13 @@ def run_frame_based_dewarping(
     output_width: int = 1920,
     aspect_ratio: str = "16:9",
     yaw_offset: float = -90.0,
+    max_workers: Optional[int] = None,
 ) -> None:
     """Dewarp frames using camera-to-building yaw computed per row.
 
     Requires CSV columns: ObjectId, vehicle_x, vehicle_y, Center_Longitude, Center_Latitude, orientation.
-    Accepts common variants via column mapping.
+    Accepts common variants via column mapping. Jobs are independent, so they
+    run on a process pool (`max_workers`, default half the CPU count).
     """
     create_output_directory(frames_output_dir)
     df = pd.read_csv(csv_path)
@@ -113,51 +552,34 @@ def run_frame_based_dewarping(
         if key not in actual:
             raise ValueError(f"Missing required column for {key}. Candidates: {candidates}")
 
-    for _, row in df.iterrows():
-        object_id = row[actual["ObjectId"]]
-        building_lon = row[actual["Center_Longitude"]]
-        building_lat = row[actual["Center_Latitude"]]
-        camera_lon = row[actual["vehicle_x"]]
-        camera_lat = row[actual["vehicle_y"]]
-        vehicle_orientation = row[actual["orientation"]]
+    # Compute all camera-to-building yaws in one vectorized pass
+    blon, blat, clon, clat, vorient = _numeric_columns(
+        df,
+        [actual[k] for k in ("Center_Longitude", "Center_Latitude", "vehicle_x", "vehicle_y", "orientation")],
+    )
+    yaws = compute_yaws(blon, blat, clon, clat, vorient, float(yaw_offset))
+    valid = np.isfinite(yaws)
+    object_ids = df[actual["ObjectId"]].to_numpy()
 
-        if any(pd.isna(v) for v in [building_lon, building_lat, camera_lon, camera_lat, vehicle_orientation]):
-            continue
+    # One directory walk instead of four glob scans per row
+    exact, suffixed = _index_frames(frames_input_dir)
 
-        bearing_to_building = calculate_bearing(camera_lat, camera_lon, building_lat, building_lon)
-        required_yaw = (bearing_to_building - float(vehicle_orientation)) % 360
-        normalized_yaw = required_yaw + yaw_offset
-        if normalized_yaw > 180:
-            normalized_yaw -= 360
-        elif normalized_yaw <= -180:
-            normalized_yaw += 360
-
-        # Find input frames by patterns
-        patterns = [
-            os.path.join(frames_input_dir, f"{object_id}.jpg"),
-            os.path.join(frames_input_dir, f"{object_id}_*.jpg"),
-            os.path.join(frames_input_dir, f"*/{object_id}.jpg"),
-            os.path.join(frames_input_dir, f"*/{object_id}_*.jpg"),
-        ]
-        found_frames: list[str] = []
-        for pat in patterns:
-            matches = glob.glob(pat)
-            if matches:
-                found_frames.extend(matches)
-                break
+    jobs: list[tuple] = []
+    for i in np.flatnonzero(valid):
+        object_id = object_ids[i]
+        normalized_yaw = yaws[i]
+
+        sid = str(object_id)
+        found_frames = exact.get(sid) or suffixed.get(sid, [])
         for input_frame in found_frames:
             out_path = os.path.join(frames_output_dir, os.path.basename(input_frame))
-            dewarp_single_frame(
-                input_path=input_frame,
-                output_path=out_path,
-                yaw=normalized_yaw,
-                pitch=pitch_angle,
-                roll=0.0,
-                horizontal_fov=h_fov,
-                output_width=output_width,
-                aspect_ratio_str=aspect_ratio,
+            jobs.append(
+                (input_frame, out_path, normalized_yaw, pitch_angle, h_fov, output_width, aspect_ratio)
             )
 
+    if jobs:
+        dewarp_batch(jobs, max_workers=max_workers)
+
 
 def dewarp_single_frame_skip_existing(
     input_path: str,
@@ -192,6 +614,7 @@ def run_smart_dewarping(
     output_width: int = 1920,
     aspect_ratio: str = "16:9",
     yaw_offset: float = -90.0,
+    max_workers: Optional[int] = None,
 ) -> None:
     os.makedirs(frames_output_dir, exist_ok=True)
     df = pd.read_csv(csv_path)
@@ -209,38 +632,36 @@ def run_smart_dewarping(
             output_width,
             aspect_ratio,
             yaw_offset,
+            max_workers,
         )
         return
 
-    for _, row in df.iterrows():
-        object_id = row["ObjectId"]
-        building_lat = row["lat"]
-        building_lon = row["long"]
-        camera_lat = row["vehicle_y_y"]
-        camera_lon = row["vehicle_x_y"]
-        vehicle_orientation = row["orientation"]
-        if any(pd.isna(v) for v in [building_lat, building_lon, camera_lat, camera_lon, vehicle_orientation]):
-            continue
-        out_frame = os.path.join(frames_output_dir, f"{object_id}.jpg")
-        if os.path.exists(out_frame):
-            continue
-        in_frame = os.path.join(frames_input_dir, f"{object_id}.jpg")
-        if not os.path.exists(in_frame):
+    blon, blat, clon, clat, vorient = _numeric_columns(
+        df, ["long", "lat", "vehicle_x_y", "vehicle_y_y", "orientation"]
+    )
+    yaws = compute_yaws(blon, blat, clon, clat, vorient, float(yaw_offset))
+    valid = np.isfinite(yaws)
+    object_ids = df["ObjectId"].to_numpy()
+
+    # Snapshot both directories once; set membership replaces per-row stat calls
+    try:
+        available_inputs = set(os.listdir(frames_input_dir))
+    except OSError:
+        available_inputs = set()
+    existing_outputs = set(os.listdir(frames_output_dir))
+
+    jobs: list[tuple] = []
+    for i in np.flatnonzero(valid):
+        object_id = object_ids[i]
+        normalized_yaw = yaws[i]
+        frame_name = f"{object_id}.jpg"
+        if frame_name in existing_outputs or frame_name not in available_inputs:
             continue
-        bearing = calculate_bearing(camera_lat, camera_lon, building_lat, building_lon)
-        required_yaw = (bearing - float(vehicle_orientation)) % 360
-        normalized_yaw = required_yaw + yaw_offset
-        if normalized_yaw > 180:
-            normalized_yaw -= 360
-        elif normalized_yaw <= -180:
-            normalized_yaw += 360
-        dewarp_single_frame_skip_existing(
-            input_path=in_frame,
-            output_path=out_frame,
-            yaw=normalized_yaw,
-            pitch=pitch_angle,
-            roll=0.0,
-            horizontal_fov=h_fov,
-            output_width=output_width,
-            aspect_ratio_str=aspect_ratio,
+        out_frame = os.path.join(frames_output_dir, frame_name)
+        in_frame = os.path.join(frames_input_dir, frame_name)
+        jobs.append(
+            (in_frame, out_frame, normalized_yaw, pitch_angle, h_fov, output_width, aspect_ratio)
         )
+
+    if jobs:
+        dewarp_batch(jobs, max_workers=max_workers)
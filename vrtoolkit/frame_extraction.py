@@ -1,17 +1,42 @@
+import json
 import os
 import time
 import shutil
 import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from typing import Tuple, Optional
 
 import pandas as pd
 
+try:
+    import av  # type: ignore
+except Exception:  # pragma: no cover - optional
+    av = None  # PyAV speeds up in-process decoding; ffmpeg CLI is the fallback
+
 
 def check_ffmpeg() -> bool:
     """Return True if `ffmpeg` binary is available in PATH."""
     return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
 
 
+@lru_cache(maxsize=32)
+def _list_video_dir(video_root: str) -> dict:
+    """Map of filename -> filename for regular files under `video_root`.
+
+    One directory read replaces the per-lookup stat sweep in
+    `find_video_file`, which matters when the videos sit on network
+    storage. Cached per root for the life of the process.
+    """
+    try:
+        with os.scandir(video_root) as entries:
+            return {e.name: e.name for e in entries if e.is_file()}
+    except OSError:
+        return {}
+
+
 def find_video_file(video_root: str, video_name: str) -> Tuple[Optional[str], Optional[str]]:
     """Try multiple naming patterns and extensions to locate a video file.
 
@@ -30,10 +55,10 @@ def find_video_file(video_root: str, video_name: str) -> Tuple[Optional[str], Op
         f"{video_name.replace('GS', 'GL')}.mp4",
         f"{video_name.replace('GS', 'GL')}.MP4",
     ]
+    listing = _list_video_dir(video_root)
     for pattern in patterns:
-        p = os.path.join(video_root, pattern)
-        if os.path.isfile(p):
-            return p, pattern
+        if pattern in listing:
+            return os.path.join(video_root, pattern), pattern
     return None, None
 
 
@@ -87,55 +112,199 @@ def extract_frame_ffmpeg(
     return False, "Max retries exceeded"
 
 
+def extract_frames_batch_ffmpeg(
+    video_path: str, frame_jobs: list, tmp_dir: str
+) -> Tuple[bool, Optional[str]]:
+    """Extract many frames of one video in a single FFmpeg invocation.
+
+    `frame_jobs` is a list of (frame_number, output_path). A single
+    `select='eq(n,f1)+eq(n,f2)+...'` filter emits all requested frames in one
+    pass, amortizing process startup and demux/decode across the batch; the
+    numbered outputs are then renamed onto the requested paths. Returns
+    (success, error_details); on failure nothing is renamed so the caller can
+    fall back to per-frame extraction.
+    """
+    jobs = sorted(frame_jobs, key=lambda j: int(j[0]))
+    select = "+".join(f"eq(n\\,{int(fn)})" for fn, _ in jobs)
+    pattern = os.path.join(tmp_dir, "out_%d.jpg")
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-i",
+        video_path,
+        "-vf",
+        f"select={select},setpts=N/FRAME_RATE_TB",
+        "-vsync",
+        "vfr",
+        "-q:v",
+        "1",
+        "-pix_fmt",
+        "yuvj420p",
+        "-loglevel",
+        "warning",
+        pattern,
+    ]
+    try:
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, timeout=60 + 5 * len(jobs)
+        )
+    except subprocess.TimeoutExpired:
+        return False, "FFmpeg timeout"
+    except Exception as e:
+        return False, str(e)
+    if result.returncode != 0:
+        return False, (result.stderr or "").strip() or f"return_code: {result.returncode}"
+
+    # Outputs are numbered in frame order; a shortfall would misalign the
+    # mapping, so treat anything but a full set as failure.
+    produced = [os.path.join(tmp_dir, f"out_{i}.jpg") for i in range(1, len(jobs) + 1)]
+    if not all(os.path.exists(p) for p in produced):
+        return False, "FFmpeg produced fewer frames than requested"
+    for src, (_, out_path) in zip(produced, jobs):
+        os.replace(src, out_path)
+    return True, None
+
+
 def get_video_info_ffmpeg(video_path: str) -> Tuple[Optional[float], Optional[float]]:
-    """Return (duration_seconds, fps) using ffprobe, or (None, None) on failure."""
+    """Return (duration_seconds, fps) using ffprobe, or (None, None) on failure.
+
+    Duration and frame rate are fetched with a single ffprobe invocation
+    (JSON output); each extra process would cost another spawn plus
+    container open.
+    """
     try:
-        duration_cmd = [
-            "ffprobe",
-            "-v",
-            "quiet",
-            "-show_entries",
-            "format=duration",
-            "-of",
-            "default=noprint_wrappers=1:nokey=1",
-            video_path,
-        ]
-        fps_cmd = [
+        cmd = [
             "ffprobe",
             "-v",
             "quiet",
-            "-show_entries",
-            "stream=r_frame_rate",
             "-select_streams",
             "v:0",
+            "-show_entries",
+            "format=duration:stream=r_frame_rate",
             "-of",
-            "default=noprint_wrappers=1:nokey=1",
+            "json",
             video_path,
         ]
-        dur = subprocess.run(duration_cmd, capture_output=True, text=True, timeout=10)
-        fps = subprocess.run(fps_cmd, capture_output=True, text=True, timeout=10)
-        duration = float(dur.stdout.strip()) if dur.returncode == 0 and dur.stdout.strip() else None
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        if result.returncode != 0 or not result.stdout.strip():
+            return None, None
+        payload = json.loads(result.stdout)
+
+        duration = None
+        raw_duration = payload.get("format", {}).get("duration")
+        if raw_duration:
+            duration = float(raw_duration)
+
         fps_val = None
-        if fps.returncode == 0 and fps.stdout.strip():
-            s = fps.stdout.strip()
-            if "/" in s:
-                n, d = s.split("/")
-                fps_val = float(n) / float(d)
+        streams = payload.get("streams") or []
+        raw_rate = streams[0].get("r_frame_rate") if streams else None
+        if raw_rate:
+            if "/" in raw_rate:
+                n, d = raw_rate.split("/")
+                fps_val = float(n) / float(d) if float(d) else None
             else:
-                fps_val = float(s)
+                fps_val = float(raw_rate)
         return duration, fps_val
     except Exception:
         return None, None
 
 
+def _extract_frames_pyav(
+    video_path: str, frame_jobs: list, fps: float
+) -> Tuple[bool, Optional[str]]:
+    """Decode requested frames in-process with PyAV (no subprocess spawns).
+
+    Opens the container once, then for each target (sorted ascending for a
+    mostly-forward pass) seeks to the nearest keyframe and decodes up to the
+    requested timestamp, saving via Pillow. Returns (success, error_details);
+    on failure the caller falls back to the ffmpeg CLI paths.
+    """
+    if av is None:
+        return False, "PyAV not installed"
+    try:
+        with av.open(video_path) as container:
+            stream = container.streams.video[0]
+            time_base = float(stream.time_base)
+            half_frame = 0.5 / fps if fps else 0.0
+            for frame_number, out_path in sorted(frame_jobs, key=lambda j: int(j[0])):
+                target = frame_number / fps
+                container.seek(int(target / time_base), stream=stream)
+                for frame in container.decode(stream):
+                    if frame.time is None or frame.time >= target - half_frame:
+                        frame.to_image().save(out_path, "JPEG", quality=95)
+                        break
+                else:
+                    return False, f"no frame decoded at frame {frame_number}"
+    except Exception as e:
+        return False, str(e)
+    return True, None
+
+
+_FFPROBE_CACHE_NAME = ".ffprobe_cache.json"
+
+
+def _stat_signature(path: str) -> Optional[str]:
+    """Identity of a file's contents for cache keying: mtime plus size."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return f"{int(st.st_mtime)}:{st.st_size}"
+
+
+def prefetch_video_info(
+    video_paths, cache_dir: str, max_workers: int = 8
+) -> dict:
+    """Probe (duration, fps) for all videos up front, consulting a persistent cache.
+
+    Results are cached in `.ffprobe_cache.json` under `cache_dir`, keyed by
+    path and invalidated by mtime/size, so repeated runs over the same videos
+    spawn no ffprobe at all. Cache misses are probed on a small thread pool
+    instead of serially inside the extraction loop.
+    """
+    cache_path = os.path.join(cache_dir, _FFPROBE_CACHE_NAME)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    info: dict = {}
+    misses = []
+    for path in video_paths:
+        sig = _stat_signature(path)
+        entry = cache.get(path)
+        if sig is not None and entry and entry.get("sig") == sig:
+            info[path] = (entry["duration"], entry["fps"])
+        else:
+            misses.append((path, sig))
+
+    if misses:
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(misses))) as executor:
+            results = executor.map(get_video_info_ffmpeg, [p for p, _ in misses])
+            for (path, sig), (duration, fps) in zip(misses, results):
+                info[path] = (duration, fps)
+                if sig is not None and duration is not None and fps is not None:
+                    cache[path] = {"sig": sig, "duration": duration, "fps": fps}
+        try:
+            tmp_path = cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(cache, f)
+            os.replace(tmp_path, cache_path)
+        except OSError:
+            pass  # the cache is an optimization only
+    return info
+
+
 def validate_frame_numbers(
-    frames_df: pd.DataFrame, video_path: str
+    frames_df: pd.DataFrame, video_path: str, video_info: Optional[Tuple] = None
 ) -> Tuple[pd.DataFrame, float]:
     """Filter frames with out-of-range frame numbers relative to video FPS/duration.
 
-    Returns (valid_frames_df, fps_used).
+    `video_info` may supply a prefetched (duration, fps) pair to avoid the
+    ffprobe call. Returns (valid_frames_df, fps_used).
     """
-    duration, fps = get_video_info_ffmpeg(video_path)
+    duration, fps = video_info if video_info is not None else get_video_info_ffmpeg(video_path)
     if duration is None or fps is None or fps <= 0:
         return frames_df, 30.0
     total_frames = int(duration * fps)
@@ -143,6 +312,64 @@ def validate_frame_numbers(
     return valid, fps
 
 
+def _extract_one_video(
+    video_name: str,
+    video_frames: pd.DataFrame,
+    video_path: str,
+    video_info: Optional[Tuple],
+    output_dir: str,
+    claimed: set,
+    claim_lock: "threading.Lock",
+) -> None:
+    """Extract all requested frames of one video (worker for the thread pool).
+
+    `claimed` tracks output names assigned across concurrently processed
+    videos; `claim_lock` serializes name assignment so duplicate ObjectIds
+    get distinct suffixes regardless of scheduling.
+    """
+    valid_frames, fps = validate_frame_numbers(video_frames, video_path, video_info)
+    if valid_frames.empty:
+        return
+
+    frame_jobs = []
+    with claim_lock:
+        for row in valid_frames.itertuples(index=False):
+            panoid = row.ObjectId
+            # handle duplicates via set membership; `claimed` is seeded from
+            # one listdir, so no stat() calls in this loop
+            base_filename = f"{panoid}.jpg"
+            counter = 1
+            while base_filename in claimed and counter <= 10:
+                base_filename = f"{panoid}_{counter}.jpg"
+                counter += 1
+            if counter > 10:
+                continue
+            claimed.add(base_filename)
+            frame_jobs.append(
+                (int(row.frame_number), os.path.join(output_dir, base_filename))
+            )
+    if not frame_jobs:
+        return
+
+    # Prefer in-process PyAV decode, then one batched ffmpeg process per
+    # video; per-frame ffmpeg seeks only as a last resort.
+    ok = False
+    if av is not None:
+        ok, error = _extract_frames_pyav(video_path, frame_jobs, fps)
+        if not ok:
+            print(f"PyAV extraction failed for {video_name} ({error}); using ffmpeg")
+    if not ok:
+        tmp_dir = tempfile.mkdtemp(prefix=".extract_", dir=output_dir)
+        try:
+            ok, error = extract_frames_batch_ffmpeg(video_path, frame_jobs, tmp_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    if not ok:
+        print(f"Batch extraction failed for {video_name} ({error}); retrying per frame")
+        for frame_number, out_path in frame_jobs:
+            extract_frame_ffmpeg(video_path, frame_number / fps, out_path)
+
+
 def run_ffmpeg_extraction(
     csv_path: str,
     video_root: str,
@@ -157,34 +384,47 @@ def run_ffmpeg_extraction(
         raise RuntimeError("FFmpeg/ffprobe not found in PATH. Please install FFmpeg.")
 
     os.makedirs(output_dir, exist_ok=True)
-    df = pd.read_csv(csv_path)
-    if not {"matched_file", "frame_number", "ObjectId"}.issubset(df.columns):
+    # Only three columns are used; skip parsing the rest of the matches CSV
+    needed = {"matched_file", "frame_number", "ObjectId"}
+    df = pd.read_csv(csv_path, usecols=lambda c: c in needed, dtype={"matched_file": str})
+    if not needed.issubset(df.columns):
         raise ValueError(
             "CSV must contain columns: matched_file, frame_number, ObjectId"
         )
 
     unique_frames = df.drop_duplicates(subset=["matched_file", "frame_number"])
 
+    # Videos are independent; run one worker thread per CPU. The heavy work
+    # happens inside the ffmpeg/ffprobe children, so threads are enough.
+    # One directory listing seeds the name set; workers then assign unique
+    # output names without any per-row filesystem probes.
+    claimed = set(os.listdir(output_dir))
+    claim_lock = threading.Lock()
     grouped = unique_frames.groupby("matched_file")
-    for video_name, video_frames in grouped:
-        video_path, _ = find_video_file(video_root, video_name)
-        if video_path is None:
-            continue
-        valid_frames, fps = validate_frame_numbers(video_frames, video_path)
-        if valid_frames.empty:
-            continue
-        for _, row in valid_frames.iterrows():
-            frame_number = row["frame_number"]
-            timestamp_sec = frame_number / fps
-            panoid = row["ObjectId"]
-            # handle duplicates
-            base_filename = f"{panoid}.jpg"
-            out_path = os.path.join(output_dir, base_filename)
-            counter = 1
-            while os.path.exists(out_path) and counter <= 10:
-                base_filename = f"{panoid}_{counter}.jpg"
-                out_path = os.path.join(output_dir, base_filename)
-                counter += 1
-            if counter > 10:
-                continue
-            extract_frame_ffmpeg(video_path, timestamp_sec, out_path)
+
+    # Resolve video files and probe all metadata before spawning workers
+    resolved = {name: find_video_file(video_root, name)[0] for name, _ in grouped}
+    info_map = prefetch_video_info(
+        {p for p in resolved.values() if p is not None}, video_root
+    )
+
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(
+                _extract_one_video,
+                video_name,
+                video_frames,
+                resolved[video_name],
+                info_map.get(resolved[video_name]),
+                output_dir,
+                claimed,
+                claim_lock,
+            ): video_name
+            for video_name, video_frames in grouped
+            if resolved[video_name] is not None
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"Extraction failed for {futures[future]}: {e}")
@@ -1,6 +1,7 @@
 import os
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 from math import radians, degrees, atan2, sin, cos
 
@@ -15,6 +16,19 @@ def calculate_bearing(lat1: float, lon1: float, lat2: float, lon2: float) -> flo
     return (bearing + 360) % 360
 
 
+def calculate_bearings(
+    lat1: np.ndarray, lon1: np.ndarray, lat2: np.ndarray, lon2: np.ndarray
+) -> np.ndarray:
+    """Vectorized `calculate_bearing` over coordinate arrays (NaN in, NaN out)."""
+    lat1, lon1, lat2, lon2 = (
+        np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2)
+    )
+    d_lon = lon2 - lon1
+    y = np.sin(d_lon) * np.cos(lat2)
+    x = np.cos(lat1) * np.sin(lat2) - np.sin(lat1) * np.cos(lat2) * np.cos(d_lon)
+    return (np.degrees(np.arctan2(y, x)) + 360) % 360
+
+
 def find_points_before_after_frame(
     gps_data: pd.DataFrame, target_frame_number: int, window_frames: int = 15
 ):
@@ -49,6 +63,20 @@ def find_points_before_after_frame(
     return before_point, after_point
 
 
+def _window_means(gps: pd.DataFrame, window_frames: int) -> tuple:
+    """Precompute the before/after window means for every frame at once.
+
+    Row `t-1` of the first frame holds the mean `find_points_before_after_frame`
+    would compute for the before-window of target `t`, and row `t+1` of the
+    second holds the after-window mean. One C-level rolling pass per file
+    replaces an O(window) slice-and-mean per footprint.
+    """
+    w = min(3, window_frames)
+    before = gps.rolling(w, min_periods=1).mean()
+    after = gps[::-1].rolling(w, min_periods=1).mean()[::-1]
+    return before, after
+
+
 def calculate_orientations_frame_based(
     buildings_csv: str,
     gps_folder: str,
@@ -62,43 +90,54 @@ def calculate_orientations_frame_based(
     Adds an `orientation` column to the buildings and writes to `output_csv` if set.
     """
     footprints = pd.read_csv(buildings_csv)
-    orientations: list[float | None] = []
-
-    for _, row in footprints.iterrows():
-        frame_number = int(row["frame_number"]) if not pd.isna(row["frame_number"]) else None
-        video_file = str(row["matched_file"]) if "matched_file" in footprints.columns else None
+    has_matched_file = "matched_file" in footprints.columns
+    # Many footprints share a video; parse each GPS file and precompute its
+    # window means once. Values are (gps, before_means, after_means).
+    gps_cache: dict[str, tuple] = {}
+    # (lat1, lon1, lat2, lon2) endpoints per row; NaN rows yield NaN bearing
+    endpoints = np.full((len(footprints), 4), np.nan)
+
+    # itertuples avoids the per-row Series allocation of iterrows
+    for i, row in enumerate(footprints.itertuples(index=False)):
+        frame_number = int(row.frame_number) if not pd.isna(row.frame_number) else None
+        video_file = str(row.matched_file) if has_matched_file else None
         if frame_number is None or video_file is None:
-            orientations.append(None)
             continue
 
         gps_file = os.path.join(gps_folder, f"{video_file}_GoPro Max-GPS5.csv")
         if "GH" in video_file:
             gps_file = gps_file.replace("GH", "GL")
-        if not os.path.exists(gps_file):
-            orientations.append(None)
-            continue
-
-        gps = pd.read_csv(gps_file)
+        cached = gps_cache.get(gps_file)
+        if cached is None:
+            if not os.path.exists(gps_file):
+                continue
+            gps = pd.read_csv(
+                gps_file,
+                usecols=["GPS (Lat.) [deg]", "GPS (Long.) [deg]"],
+                dtype=np.float64,
+            )
+            cached = (gps, *_window_means(gps, window_frames))
+            gps_cache[gps_file] = cached
+        gps, before_means, after_means = cached
         if gps.empty or frame_number >= len(gps):
-            orientations.append(None)
             continue
 
-        before_point, after_point = find_points_before_after_frame(
-            gps, frame_number, window_frames=window_frames
-        )
-        if before_point is None or after_point is None:
-            orientations.append(None)
+        # O(1) lookups into the precomputed window means; the same empty-window
+        # conditions as find_points_before_after_frame apply.
+        if window_frames < 1 or frame_number < 1 or frame_number + 1 >= len(gps):
             continue
 
-        bearing = calculate_bearing(
-            before_point["GPS (Lat.) [deg]"],
-            before_point["GPS (Long.) [deg]"],
-            after_point["GPS (Lat.) [deg]"],
-            after_point["GPS (Long.) [deg]"],
+        endpoints[i] = (
+            before_means["GPS (Lat.) [deg]"].iat[frame_number - 1],
+            before_means["GPS (Long.) [deg]"].iat[frame_number - 1],
+            after_means["GPS (Lat.) [deg]"].iat[frame_number + 1],
+            after_means["GPS (Long.) [deg]"].iat[frame_number + 1],
         )
-        orientations.append(bearing)
 
-    footprints["orientation"] = orientations
+    # One vectorized trig pass over all footprints instead of per-row math
+    footprints["orientation"] = calculate_bearings(
+        endpoints[:, 0], endpoints[:, 1], endpoints[:, 2], endpoints[:, 3]
+    )
     if output_csv:
         footprints.to_csv(output_csv, index=False)
     return footprints
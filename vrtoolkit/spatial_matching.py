@@ -2,8 +2,10 @@ import os
 import glob
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
+import shapely
 from shapely.geometry import Point
 from pyproj import Transformer
 
@@ -60,53 +62,68 @@ def run_spatial_index_matching(
         crs="EPSG:4326",
     ).to_crs(epsg=5070)
 
-    # Build buffered geometries and spatial index
-    ref_buffered = ref_gdf.copy()
-    ref_buffered["geometry"] = ref_buffered.geometry.buffer(buffer_distance)
-    sindex = ref_buffered.sindex
+    # Only the buffered geometry array is needed for candidate lookup;
+    # copying the whole footprint frame would double memory for nothing.
+    buffered_geoms = np.asarray(ref_gdf.geometry.buffer(buffer_distance).values)
+    buffered_tree = shapely.STRtree(buffered_geoms)
+    ref_index = ref_gdf.index.to_numpy()
+    ref_geoms = np.asarray(ref_gdf.geometry.values)
 
     # Prepare GPS file discovery and transformer
     gps_pattern = os.path.join(coords_folder, "*_GoPro Max-GPS5.csv")
     files_to_process = sorted(os.path.basename(p) for p in glob.glob(gps_pattern))
     transformer = Transformer.from_crs("EPSG:4326", ref_gdf.crs, always_xy=True)
 
-    matches = []
+    gps_frames: list[tuple[str, pd.DataFrame]] = []
     for filename in files_to_process:
         file_path = os.path.join(coords_folder, filename)
         if not os.path.isfile(file_path):
             continue
-        df = pd.read_csv(file_path)
+        df = pd.read_csv(
+            file_path,
+            usecols=["GPS (Long.) [deg]", "GPS (Lat.) [deg]"],
+            dtype=np.float64,
+        )
         if df.empty:
             continue
-
-        # Project GPS points to ref CRS
-        x_coords, y_coords = transformer.transform(
-            df["GPS (Long.) [deg]"].values, df["GPS (Lat.) [deg]"].values
-        )
-        gdf = gpd.GeoDataFrame(
-            df, geometry=gpd.points_from_xy(x_coords, y_coords), crs=ref_gdf.crs
+        gps_frames.append((filename, df))
+
+    # Project every file's coordinates in a single PROJ call, then split the
+    # result back per file; one call over N*k points beats N separate calls.
+    x_parts: list[np.ndarray] = []
+    y_parts: list[np.ndarray] = []
+    if gps_frames:
+        xs, ys = transformer.transform(
+            np.concatenate([df["GPS (Long.) [deg]"].to_numpy() for _, df in gps_frames]),
+            np.concatenate([df["GPS (Lat.) [deg]"].to_numpy() for _, df in gps_frames]),
         )
+        offsets = np.cumsum([len(df) for _, df in gps_frames])[:-1]
+        x_parts = list(np.split(np.asarray(xs), offsets))
+        y_parts = list(np.split(np.asarray(ys), offsets))
 
-        for idx, gps_point in gdf.iterrows():
-            geom = gps_point.geometry
-            candidates = list(sindex.intersection(geom.bounds))
-            if not candidates:
-                continue
-            containing = ref_buffered.loc[candidates]
-            actual = containing[containing.contains(geom)]
-            for ref_idx in actual.index:
-                ref_point = ref_gdf.loc[ref_idx]
-                dist = geom.distance(ref_point.geometry)
-                matches.append(
-                    {
-                        "ref_index": ref_idx,
-                        "frame_number": idx,
-                        "matched_file": filename.split("_GoPro Max-GPS5.csv")[0],
-                        "vehicle_x": df.loc[idx, "GPS (Long.) [deg]"],
-                        "vehicle_y": df.loc[idx, "GPS (Lat.) [deg]"],
-                        "distance": dist,
-                    }
-                )
+    matches = []
+    for (filename, df), x_coords, y_coords in zip(gps_frames, x_parts, y_parts):
+        # Query the STRtree with the whole point array at once; no per-file
+        # GeoDataFrame or join machinery is needed for a plain lookup.
+        matched_name = filename.split("_GoPro Max-GPS5.csv")[0]
+        lon_vals = df["GPS (Long.) [deg]"].to_numpy()
+        lat_vals = df["GPS (Lat.) [deg]"].to_numpy()
+        gps_points = shapely.points(x_coords, y_coords)
+        frame_idx, ref_pos = buffered_tree.query(gps_points, predicate="within")
+        if frame_idx.size == 0:
+            continue
+        ref_idx = ref_index[ref_pos]
+        distances = shapely.distance(gps_points[frame_idx], ref_geoms[ref_pos])
+        matches.append(
+            {
+                "ref_index": ref_idx,
+                "frame_number": frame_idx,
+                "matched_file": matched_name,
+                "vehicle_x": lon_vals[frame_idx],
+                "vehicle_y": lat_vals[frame_idx],
+                "distance": distances,
+            }
+        )
 
     if not matches:
         result = ref_gdf.reset_index(drop=False)
@@ -117,9 +134,30 @@ def run_spatial_index_matching(
             result.to_csv(output_csv, index=False)
         return result
 
-    matches_df = pd.DataFrame(matches)
-    best = matches_df.loc[matches_df.groupby("ref_index")["distance"].idxmin()].drop(
-        columns=["distance"]
+    # Pick the min-distance match per footprint on concatenated columnar
+    # arrays: one stable sort by (ref_index, distance), then the first row of
+    # each group. No intermediate all-matches DataFrame or groupby needed.
+    ref_arr = np.concatenate([m["ref_index"] for m in matches])
+    dist_arr = np.concatenate([m["distance"] for m in matches])
+    frame_arr = np.concatenate([m["frame_number"] for m in matches])
+    vx_arr = np.concatenate([m["vehicle_x"] for m in matches])
+    vy_arr = np.concatenate([m["vehicle_y"] for m in matches])
+    file_arr = np.concatenate(
+        [np.full(len(m["ref_index"]), m["matched_file"], dtype=object) for m in matches]
+    )
+
+    order = np.lexsort((dist_arr, ref_arr))
+    sorted_ref = ref_arr[order]
+    group_first = np.concatenate(([True], sorted_ref[1:] != sorted_ref[:-1]))
+    keep = order[group_first]
+    best = pd.DataFrame(
+        {
+            "ref_index": ref_arr[keep],
+            "frame_number": frame_arr[keep],
+            "matched_file": file_arr[keep],
+            "vehicle_x": vx_arr[keep],
+            "vehicle_y": vy_arr[keep],
+        }
     )
     merged = (
         ref_gdf.reset_index()